@@ -1,14 +1,20 @@
 # app.py
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from io import BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 import os
+import csv
+import logging
+import tempfile
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------
 # 🎯 PAGE CONFIGURATION
 # ---------------------------------------
@@ -21,7 +27,7 @@ st.set_page_config(
 # ---------------------------------------
 # 🎨 PROFESSIONAL CYBER-THEME STYLING
 # ---------------------------------------
-st.markdown("""
+APP_CSS = """
 <style>
 body {
     background-color: #f7f9fb;
@@ -63,18 +69,20 @@ body {
     box-shadow: 0 4px 10px rgba(0,0,0,0.04);
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # ---------------------------------------
 # 🌐 HEADER WITH CYBER IMAGE (Online)
 # ---------------------------------------
-st.markdown("""
+BANNER_HTML = """
 <div class="banner">
     <img src="https://cdn-icons-png.flaticon.com/512/3075/3075977.png" alt="cyber awareness"/>
     <h1>🔒 Digital Footprints & Privacy Awareness</h1>
     <p style="margin:0">Interactive Dashboard — Insights, Visuals & Awareness</p>
 </div>
-""", unsafe_allow_html=True)
+"""
+st.markdown(BANNER_HTML, unsafe_allow_html=True)
 
 # ---------------------------------------
 # 📊 LOAD DATA
@@ -84,91 +92,163 @@ if not os.path.exists(DATA_FILE):
     st.error(f"Data file not found: {DATA_FILE}. Put your CSV in the app folder.")
     st.stop()
 
-data = pd.read_csv(DATA_FILE)
+# Version of the Parquet copy's contents; bump it whenever load_data's transforms
+# change so copies written by older code are rebuilt instead of reused
+PARQUET_FORMAT = 2
+
+def write_parquet_copy(df: pd.DataFrame, target: str):
+    # Write beside the target and swap it in, so no reader ever sees a partial file
+    tmp = None
+    try:
+        fd, tmp = tempfile.mkstemp(
+            dir=os.path.dirname(target) or ".",
+            prefix=os.path.basename(target) + ".",
+            suffix=".tmp"
+        )
+        os.close(fd)
+        df.to_parquet(tmp, compression="snappy")
+        os.replace(tmp, target)
+    except Exception as e:
+        # Read-only folder or no parquet engine: keep serving from the CSV
+        logger.warning("Could not write %s: %s", target, e)
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
 
-# Detect date column (optional)
-date_col = None
-for c in data.columns:
-    if 'date' in c.lower():
-        date_col = c
+@st.cache_data(max_entries=1)
+def load_data(path: str, mtime: float):
+    # mtime is only part of the cache key so an edited CSV is re-read
+    # Binary columnar copy next to the CSV, rebuilt whenever the CSV is newer
+    parquet_path = f"{os.path.splitext(path)[0]}.v{PARQUET_FORMAT}.parquet"
+    df = None
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= mtime:
         try:
-            data[date_col] = pd.to_datetime(data[date_col])
-        except:
-            date_col = None
-        break
+            df = pd.read_parquet(parquet_path)
+        except Exception as e:
+            # Unreadable copy (e.g. truncated): rebuild it from the CSV below
+            logger.warning("Ignoring unreadable %s: %s", parquet_path, e)
+    from_parquet = df is not None
 
-# ---------------------------------------
-# 🧭 SIDEBAR FILTERS
-# ---------------------------------------
-st.sidebar.header("🔍 Filters & Options")
-age_filter = st.sidebar.multiselect("Select Age Group", options=sorted(data["Age_Group"].unique()))
-platform_filter = st.sidebar.multiselect("Select Platform", options=sorted(data["Platform"].unique()))
+    if not from_parquet:
+        # Parse date-like columns while reading; parquet then stores them natively
+        header = pd.read_csv(path, nrows=0).columns
+        df = pd.read_csv(path, parse_dates=[c for c in header if 'date' in c.lower()])
+        # pandas reads the literal "None" (no privacy tool) as NaN; keep it a real group
+        df["Privacy_Tools_Used"] = df["Privacy_Tools_Used"].fillna("None")
 
-if date_col:
-    min_date = data[date_col].min()
-    max_date = data[date_col].max()
-    date_range = st.sidebar.date_input("Select date range", value=(min_date.date(), max_date.date()))
-else:
-    date_range = None
+    # Detect date column (optional): unparseable columns stay as text
+    dt_cols = df.select_dtypes(include=["datetime", "datetimetz"]).columns
+    date_col = dt_cols[0] if len(dt_cols) else None
 
-filtered = data.copy()
-if age_filter:
-    filtered = filtered[filtered["Age_Group"].isin(age_filter)]
-if platform_filter:
-    filtered = filtered[filtered["Platform"].isin(platform_filter)]
-if date_col and date_range:
-    start, end = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
-    filtered = filtered[(filtered[date_col] >= start) & (filtered[date_col] <= end)]
+    # Low-cardinality text columns: filter and group on integer codes
+    for c in ("Age_Group", "Platform", "Privacy_Tools_Used"):
+        df[c] = df[c].astype("category")
 
-# ---------------------------------------
-# 🗂 TABS
-# ---------------------------------------
-tab_dashboard, tab_tips, tab_about = st.tabs(["📊 Dashboard", "💡 Tips", "📘 About & Feedback"])
+    if not from_parquet:
+        write_parquet_copy(df, parquet_path)
+    return df, date_col
+
+data_version = os.path.getmtime(DATA_FILE)
+data, date_col = load_data(DATA_FILE, data_version)
+
+@st.cache_data(max_entries=1)
+def sidebar_options(version: float, _df: pd.DataFrame, date_col):
+    date_bounds = None
+    if date_col:
+        date_bounds = (_df[date_col].min().date(), _df[date_col].max().date())
+    return (
+        _df["Age_Group"].cat.categories.tolist(),
+        _df["Platform"].cat.categories.tolist(),
+        date_bounds,
+    )
+
+age_options, platform_options, date_bounds = sidebar_options(data_version, data, date_col)
 
 # ---------------------------------------
-# 📊 DASHBOARD TAB
+# 🧮 CACHED AGGREGATES & REPORTS
 # ---------------------------------------
-with tab_dashboard:
-    st.markdown("### Quick Insights")
-    c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Records", len(filtered))
-    c2.metric("Avg Time (hrs/day)", round(filtered["Time_Spent (hrs/day)"].mean(), 2))
-    c3.metric("Avg Data Shared (%)", round(filtered["Data_Shared (%)"].mean(), 2))
-    c4.metric("Avg Awareness (0-5)", round(filtered["Awareness_Level"].mean(), 2))
-    st.divider()
+@st.cache_data(max_entries=32)
+def summary_stats(filter_key: tuple, _df: pd.DataFrame):
+    # Keyed on the filter selection like the figure builders below; hashing the
+    # frame itself would cost about as much as the aggregation.
+    # A single sum/count hash aggregation yields both the per-platform means
+    # (bar chart, leaderboard) and the overall means (metrics, gauge, PDF)
+    totals = _df.groupby("Platform", observed=True, dropna=False)[
+        ["Time_Spent (hrs/day)", "Data_Shared (%)", "Awareness_Level"]
+    ].agg(["sum", "count"])
+    sums = totals.xs("sum", axis=1, level=1)
+    counts = totals.xs("count", axis=1, level=1)
+
+    overall = sums.sum() / counts.sum()
+    per_platform = (sums / counts)[["Data_Shared (%)", "Awareness_Level"]].round(2)
+    per_platform = per_platform[per_platform.index.notna()]
+    return per_platform, overall
 
-    # 📈 Charts
-    st.subheader("📊 Data Shared by Platform")
-    fig_bar = px.bar(
-        filtered.groupby("Platform", as_index=False)["Data_Shared (%)"].mean(),
+# Figures are keyed on the filter selection only; the leading underscore keeps
+# Streamlit from hashing the frames passed alongside it.
+@st.cache_resource(max_entries=32)
+def build_bar(filter_key: tuple, _agg: pd.DataFrame) -> go.Figure:
+    return px.bar(
+        _agg,
         x="Platform", y="Data_Shared (%)",
         title="Average Data Shared per Platform",
         color="Platform"
     )
-    st.plotly_chart(fig_bar, use_container_width=True)
-
-    st.subheader("📉 Awareness vs Time Spent")
-    fig_scatter = px.scatter(
-        filtered,
-        x="Time_Spent (hrs/day)",
-        y="Awareness_Level",
-        color="Platform",
-        size="Data_Shared (%)",
-        hover_data=["Privacy_Tools_Used"],
-        title="Time Spent vs Awareness Level"
+
+@st.cache_resource(max_entries=32)
+def build_scatter(filter_key: tuple, _df: pd.DataFrame) -> go.Figure:
+    # Past ~50k points a sample looks the same and keeps the payload small
+    if len(_df) > 50_000:
+        _df = _df.sample(n=20_000, random_state=0)
+    # WebGL (scattergl) once SVG markers start to drag in the browser
+    trace = go.Scattergl if len(_df) >= 500 else go.Scatter
+    # Same bubble scaling as px.scatter(size=..., size_max=20)
+    max_shared = _df["Data_Shared (%)"].max()
+    sizeref = 2.0 * max_shared / 20 ** 2 if max_shared > 0 else 1
+
+    # Hand plotly plain arrays, one trace per platform, instead of the frame
+    fig = go.Figure()
+    for platform, group in _df.groupby("Platform", observed=True):
+        fig.add_trace(trace(
+            x=group["Time_Spent (hrs/day)"].to_numpy(),
+            y=group["Awareness_Level"].to_numpy(),
+            mode="markers",
+            name=str(platform),
+            marker=dict(
+                size=group["Data_Shared (%)"].to_numpy(),
+                sizemode="area",
+                sizeref=sizeref,
+            ),
+            customdata=group["Privacy_Tools_Used"].to_numpy(dtype=object),
+            hovertemplate=(
+                f"Platform={platform}<br>Time_Spent (hrs/day)=%{{x}}<br>"
+                "Awareness_Level=%{y}<br>Data_Shared (%)=%{marker.size}<br>"
+                "Privacy_Tools_Used=%{customdata}<extra></extra>"
+            ),
+        ))
+    fig.update_layout(
+        title="Time Spent vs Awareness Level",
+        xaxis_title="Time_Spent (hrs/day)",
+        yaxis_title="Awareness_Level",
+        legend_title_text="Platform"
     )
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    return fig
 
-    st.subheader("🔐 Privacy Tools Adoption")
-    fig_pie = px.pie(filtered, names="Privacy_Tools_Used", title="Privacy Tools Usage Distribution")
-    st.plotly_chart(fig_pie, use_container_width=True)
+@st.cache_resource(max_entries=32)
+def build_pie(filter_key: tuple, _df: pd.DataFrame) -> go.Figure:
+    # The loader fills missing tools with "None", so no rows are dropped here
+    counts = _df["Privacy_Tools_Used"].value_counts()
+    counts = counts[counts > 0]
+    return px.pie(
+        values=counts.to_numpy(),
+        names=counts.index.tolist(),
+        title="Privacy Tools Usage Distribution"
+    )
 
-    # Awareness Gauge
-    st.subheader("📈 Overall Awareness Score")
-    avg_awareness = round(filtered["Awareness_Level"].mean(), 2)
-    gauge = go.Figure(go.Indicator(
+@st.cache_resource(max_entries=32)
+def build_gauge(value: float) -> go.Figure:
+    return go.Figure(go.Indicator(
         mode="gauge+number",
-        value=avg_awareness if not pd.isna(avg_awareness) else 0,
+        value=value,
         domain={'x': [0, 1], 'y': [0, 1]},
         title={'text': "Awareness (0-5)"},
         gauge={
@@ -181,75 +261,163 @@ with tab_dashboard:
             ]
         }
     ))
-    st.plotly_chart(gauge, use_container_width=True)
 
-    # Leaderboard
-    st.subheader("🏆 Platforms by Awareness Level")
-    lb = filtered.groupby("Platform", as_index=False)["Awareness_Level"].mean().sort_values(by="Awareness_Level", ascending=False)
-    lb["Awareness_Level"] = lb["Awareness_Level"].round(2)
-    st.dataframe(lb.reset_index(drop=True), use_container_width=True)
+@st.cache_data(max_entries=32)
+def generate_pdf_bytes(records: int, avg_time: float, avg_shared: float, avg_aware: float,
+                       lb: pd.DataFrame) -> bytes:
+    # Takes only the summary values so the cache key stays small
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter, pageCompression=1)
+    pdf.setTitle("Digital Privacy Summary")
+    pdf.setFont("Helvetica-Bold", 16)
+    pdf.drawString(150, 750, "Digital Privacy Summary Report")
 
-    # Downloads
-    st.divider()
-    st.subheader("⬇️ Downloads")
-
-    col_a, col_b = st.columns(2)
-    csv_bytes = filtered.to_csv(index=False).encode('utf-8')
-    with col_a:
-        st.download_button(
-            "💾 Download Filtered Data (CSV)",
-            data=csv_bytes,
-            file_name=f"filtered_privacy_data_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-            mime="text/csv"
-        )
+    # Text objects batch each block into a single BT ... ET section
+    summary = pdf.beginText(50, 720)
+    summary.setFont("Helvetica", 12)
+    summary.setLeading(20)
+    summary.textLine(f"Records: {records}")
+    summary.textLine(f"Avg Time Spent: {avg_time} hrs/day")
+    summary.textLine(f"Avg Data Shared: {avg_shared} %")
+    summary.textLine(f"Avg Awareness: {avg_aware} / 5")
+    pdf.drawText(summary)
+
+    pdf.line(50, 640, 550, 640)
+    pdf.setFont("Helvetica", 11)
+    pdf.drawString(50, 620, "Top Platforms by Awareness:")
+    top = pdf.beginText(60, 600)
+    top.setFont("Helvetica", 11)
+    top.setLeading(16)
+    for platform, awareness in lb.head(5)[["Platform", "Awareness_Level"]].itertuples(index=False):
+        top.textLine(f"{platform}: {awareness}")
+    pdf.drawText(top)
+    pdf.drawString(50, 120, "Generated by Atharv Jagtap— Digital Privacy Dashboard")
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+# ---------------------------------------
+# 🧭 SIDEBAR FILTERS
+# ---------------------------------------
+st.sidebar.header("🔍 Filters & Options")
+age_filter = st.sidebar.multiselect("Select Age Group", options=age_options)
+platform_filter = st.sidebar.multiselect("Select Platform", options=platform_options)
+
+if date_col:
+    date_range = st.sidebar.date_input("Select date range", value=date_bounds)
+else:
+    date_range = None
 
-    def generate_pdf_bytes(df: pd.DataFrame) -> BytesIO:
-        buffer = BytesIO()
-        pdf = canvas.Canvas(buffer, pagesize=letter)
-        pdf.setTitle("Digital Privacy Summary")
-        pdf.setFont("Helvetica-Bold", 16)
-        pdf.drawString(150, 750, "Digital Privacy Summary Report")
-        pdf.setFont("Helvetica", 12)
-        pdf.drawString(50, 720, f"Records: {len(df)}")
-        pdf.drawString(50, 700, f"Avg Time Spent: {round(df['Time_Spent (hrs/day)'].mean(),2)} hrs/day")
-        pdf.drawString(50, 680, f"Avg Data Shared: {round(df['Data_Shared (%)'].mean(),2)} %")
-        pdf.drawString(50, 660, f"Avg Awareness: {round(df['Awareness_Level'].mean(),2)} / 5")
-        pdf.line(50, 640, 550, 640)
-        pdf.setFont("Helvetica", 11)
-        pdf.drawString(50, 620, "Top Platforms by Awareness:")
-        top = lb.head(5)
-        y = 600
-        for _, row in top.iterrows():
-            pdf.drawString(60, y, f"{row['Platform']}: {row['Awareness_Level']}")
-            y -= 16
-        pdf.drawString(50, 120, "Generated by Atharv Jagtap— Digital Privacy Dashboard")
-        pdf.showPage()
-        pdf.save()
-        buffer.seek(0)
-        return buffer
-
-    with col_b:
-        pdf_buffer = generate_pdf_bytes(filtered)
-        st.download_button(
-            "📘 Download Summary (PDF)",
-            data=pdf_buffer,
-            file_name=f"privacy_summary_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-            mime="application/pdf"
+# Build one combined mask and index the frame once. When nothing narrows the
+# selection (the default first render) the loaded frame is used as-is.
+date_active = bool(date_col and date_range)
+filtered = data
+if age_filter or platform_filter or date_active:
+    mask = np.ones(len(data), dtype=bool)
+    if age_filter:
+        mask &= data["Age_Group"].isin(age_filter).to_numpy()
+    if platform_filter:
+        mask &= data["Platform"].isin(platform_filter).to_numpy()
+    if date_active:
+        start, end = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
+        # Compare raw int64 nanoseconds; both bounds fold into the mask in place
+        ns = data[date_col].to_numpy(dtype="datetime64[ns]").view("i8")
+        np.logical_and(mask, ns >= start.value, out=mask)
+        np.logical_and(mask, ns <= end.value, out=mask)
+    filtered = data[mask]
+
+filter_key = (
+    data_version,
+    tuple(sorted(age_filter)),
+    tuple(sorted(platform_filter)),
+    tuple(date_range) if date_range else None,
+)
+
+# ---------------------------------------
+# 🗂 TABS
+# ---------------------------------------
+tab_dashboard, tab_tips, tab_about = st.tabs(["📊 Dashboard", "💡 Tips", "📘 About & Feedback"])
+
+# ---------------------------------------
+# 📊 DASHBOARD TAB
+# ---------------------------------------
+with tab_dashboard:
+    if filtered.empty:
+        st.info("No records match the selected filters.")
+    else:
+        st.markdown("### Quick Insights")
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Records", len(filtered))
+        agg, means = summary_stats(filter_key, filtered)
+        avg_time, avg_shared, avg_awareness = np.round(
+            means[["Time_Spent (hrs/day)", "Data_Shared (%)", "Awareness_Level"]].to_numpy(), 2
         )
+        c2.metric("Avg Time (hrs/day)", avg_time)
+        c3.metric("Avg Data Shared (%)", avg_shared)
+        c4.metric("Avg Awareness (0-5)", avg_awareness)
+        st.divider()
+
+        # 📈 Charts
+        st.subheader("📊 Data Shared by Platform")
+        fig_bar = build_bar(filter_key, agg["Data_Shared (%)"].reset_index())
+        st.plotly_chart(fig_bar, use_container_width=True)
+
+        st.subheader("📉 Awareness vs Time Spent")
+        fig_scatter = build_scatter(filter_key, filtered)
+        st.plotly_chart(fig_scatter, use_container_width=True)
+
+        st.subheader("🔐 Privacy Tools Adoption")
+        fig_pie = build_pie(filter_key, filtered)
+        st.plotly_chart(fig_pie, use_container_width=True)
+
+        # Awareness Gauge
+        st.subheader("📈 Overall Awareness Score")
+        gauge = build_gauge(avg_awareness if not pd.isna(avg_awareness) else 0)
+        st.plotly_chart(gauge, use_container_width=True)
+
+        # Leaderboard
+        st.subheader("🏆 Platforms by Awareness Level")
+        lb = agg["Awareness_Level"].sort_values(ascending=False).reset_index()
+        st.dataframe(lb, use_container_width=True)
+
+        # Downloads
+        st.divider()
+        st.subheader("⬇️ Downloads")
+
+        col_a, col_b = st.columns(2)
+        csv_bytes = filtered.to_csv(index=False).encode('utf-8')
+        with col_a:
+            st.download_button(
+                "💾 Download Filtered Data (CSV)",
+                data=csv_bytes,
+                file_name=f"filtered_privacy_data_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                mime="text/csv"
+            )
+
+        with col_b:
+            pdf_buffer = generate_pdf_bytes(len(filtered), avg_time, avg_shared, avg_awareness, lb)
+            st.download_button(
+                "📘 Download Summary (PDF)",
+                data=pdf_buffer,
+                file_name=f"privacy_summary_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+                mime="application/pdf"
+            )
 
 # ---------------------------------------
 # 💡 TIPS TAB
 # ---------------------------------------
+TIPS_HTML = """
+<div class="tip-card">🔑 Use strong, unique passwords for every account.</div>
+<div class="tip-card">🧱 Enable Two-Factor Authentication (2FA) wherever possible.</div>
+<div class="tip-card">📵 Avoid clicking on unknown links or attachments.</div>
+<div class="tip-card">🌐 Use VPNs on public Wi-Fi networks.</div>
+<div class="tip-card">🔍 Regularly review app permissions on your devices.</div>
+<div class="tip-card">🚫 Don't overshare personal information online.</div>
+"""
+
 with tab_tips:
     st.subheader("Practical Privacy Tips")
-    st.markdown("""
-    <div class="tip-card">🔑 Use strong, unique passwords for every account.</div>
-    <div class="tip-card">🧱 Enable Two-Factor Authentication (2FA) wherever possible.</div>
-    <div class="tip-card">📵 Avoid clicking on unknown links or attachments.</div>
-    <div class="tip-card">🌐 Use VPNs on public Wi-Fi networks.</div>
-    <div class="tip-card">🔍 Regularly review app permissions on your devices.</div>
-    <div class="tip-card">🚫 Don't overshare personal information online.</div>
-    """, unsafe_allow_html=True)
+    st.markdown(TIPS_HTML, unsafe_allow_html=True)
 
 # ---------------------------------------
 # 📘 ABOUT TAB
@@ -272,11 +440,12 @@ with tab_about:
             st.warning("Please write something before submitting.")
         else:
             fb_file = "feedback.csv"
-            row = {"timestamp": datetime.now().isoformat(), "feedback": feedback}
-            if os.path.exists(fb_file):
-                df_fb = pd.read_csv(fb_file)
-                df_fb = pd.concat([df_fb, pd.DataFrame([row])], ignore_index=True)
-            else:
-                df_fb = pd.DataFrame([row])
-            df_fb.to_csv(fb_file, index=False)
+            need_header = not os.path.exists(fb_file) or os.path.getsize(fb_file) == 0
+            # Append one row instead of rewriting the whole feedback history
+            with open(fb_file, "a", newline="", encoding="utf-8") as f:
+                # Match the "\n" line endings pandas wrote the existing file with
+                writer = csv.writer(f, lineterminator="\n")
+                if need_header:
+                    writer.writerow(["timestamp", "feedback"])
+                writer.writerow([datetime.now().isoformat(), feedback])
             st.success("✅ Thanks! Your feedback was saved.")